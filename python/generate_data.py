@@ -56,7 +56,10 @@ def generate_customers():
     # Save as JSON
     with open('data/customers.json', 'w') as f:
         json.dump(customers, f, indent=2)
-    
+    # Parquet copy lets the ETL skip JSON parsing on every run
+    pd.DataFrame(customers).to_parquet('data/customers.parquet',
+                                       compression='zstd', index=False)
+
     print(f"✓ Generated {len(customers)} customers (saved to customers.json)")
     return customers
 
@@ -90,10 +93,11 @@ def generate_products():
                 products.append(product)
                 product_id += 1
     
-    # Create DataFrame and save as CSV
+    # Create DataFrame and save as CSV (plus a Parquet copy for the ETL)
     df = pd.DataFrame(products)
     df.to_csv('data/products.csv', index=False)
-    
+    df.to_parquet('data/products.parquet', compression='zstd', index=False)
+
     print(f"✓ Generated {len(products)} products (saved to products.csv)")
     return df
 
@@ -117,7 +121,9 @@ def generate_regions():
     
     df = pd.DataFrame(regions)
     df.to_excel('data/regions.xlsx', index=False)
-    
+    # Also keep a Parquet copy so the ETL can skip Excel parsing
+    df.to_parquet('data/regions.parquet', index=False)
+
     print(f"✓ Generated {len(regions)} regions (saved to regions.xlsx)")
     return df
 
@@ -127,56 +133,49 @@ def generate_regions():
 def generate_sales(customers, products_df, regions_df):
     """Generate sales transaction data"""
     print("Generating sales transactions...")
-    
+
     # Date range: last 2 years
     start_date = datetime.now() - timedelta(days=730)
     end_date = datetime.now()
-    
-    sales = []
-    
-    for i in range(NUM_SALES):
-        # Random date in range
-        days_diff = (end_date - start_date).days
-        random_days = random.randint(0, days_diff)
-        order_date = start_date + timedelta(days=random_days)
-        
-        # Random customer
-        customer = random.choice(customers)
-        
-        # Random product
-        product = products_df.sample(n=1).iloc[0]
-        
-        # Find matching region for customer's country
-        region_row = regions_df[regions_df['country'] == customer['country']]
-        if len(region_row) > 0:
-            region = region_row.iloc[0]['region_name']
-        else:
-            region = 'Other'
-        
-        # Generate transaction details
-        quantity = random.randint(1, 10)
-        discount = round(random.choice([0, 0, 0, 0.05, 0.1, 0.15, 0.2]), 2)
-        
-        sale = {
-            'sale_id': f'SALE{i+1:07d}',
-            'order_date': order_date.strftime('%Y-%m-%d'),
-            'customer_id': customer['customer_id'],
-            'product_id': product['product_id'],
-            'region': region,
-            'quantity': quantity,
-            'unit_price': product['unit_price'],
-            'discount': discount
-        }
-        sales.append(sale)
-        
-        if (i + 1) % 1000 == 0:
-            print(f"  Generated {i+1} sales transactions...")
-    
-    # Create DataFrame and save as CSV
-    df = pd.DataFrame(sales)
+    days_diff = (end_date - start_date).days
+
+    # Draw every random value for the whole batch in one vectorized pass
+    # instead of sampling a DataFrame row per transaction
+    rng = np.random.default_rng(42)
+    product_idx = rng.integers(0, len(products_df), NUM_SALES)
+    customer_idx = rng.integers(0, len(customers), NUM_SALES)
+    random_days = rng.integers(0, days_diff + 1, NUM_SALES)
+    quantity = rng.integers(1, 11, NUM_SALES)
+    discount_choices = np.array([0, 0, 0, 0.05, 0.1, 0.15, 0.2])
+    discount = discount_choices[rng.integers(0, len(discount_choices), NUM_SALES)]
+
+    customers_df = pd.DataFrame(customers)
+    order_dates = pd.Timestamp(start_date) + pd.to_timedelta(random_days, unit='D')
+
+    # Map each customer country to its region with one hash join instead
+    # of filtering regions_df per row
+    country_to_region = dict(zip(regions_df['country'], regions_df['region_name']))
+    customer_countries = customers_df['country'].to_numpy()[customer_idx]
+    regions = pd.Series(customer_countries).map(country_to_region).fillna('Other').to_numpy()
+
+    # Create DataFrame column by column and save as CSV
+    df = pd.DataFrame({
+        'sale_id': [f'SALE{i+1:07d}' for i in range(NUM_SALES)],
+        'order_date': order_dates.strftime('%Y-%m-%d'),
+        'customer_id': customers_df['customer_id'].to_numpy()[customer_idx],
+        'product_id': products_df['product_id'].to_numpy()[product_idx],
+        'region': regions,
+        'quantity': quantity,
+        'unit_price': products_df['unit_price'].to_numpy()[product_idx],
+        'discount': discount
+    })
     df.to_csv('data/sales.csv', index=False)
-    
-    print(f"✓ Generated {len(sales)} sales transactions (saved to sales.csv)")
+    # Parquet copy keeps real timestamp/numeric dtypes and dictionary-
+    # encoded id columns, so the ETL loads it without re-parsing
+    df.assign(order_date=order_dates.normalize()).to_parquet(
+        'data/sales.parquet', compression='zstd', index=False)
+
+    print(f"✓ Generated {len(df)} sales transactions (saved to sales.csv)")
     return df
 
 # ====================
@@ -192,8 +191,13 @@ def introduce_data_quality_issues():
     # Randomly set 2% of discounts to null
     null_indices = np.random.choice(sales_df.index, size=int(len(sales_df) * 0.02), replace=False)
     sales_df.loc[null_indices, 'discount'] = np.nan
-    
+
     sales_df.to_csv('data/sales.csv', index=False)
+
+    # Keep the Parquet copy in sync with the same null rows
+    parquet_df = pd.read_parquet('data/sales.parquet')
+    parquet_df.loc[null_indices, 'discount'] = np.nan
+    parquet_df.to_parquet('data/sales.parquet', compression='zstd', index=False)
     print("✓ Added missing values to demonstrate data cleaning")
 
 # ====================
@@ -12,6 +12,16 @@ END $$;
 BEGIN;
 
 -- Drop tables if they exist (in reverse order of dependencies)
+-- The summary tables, change log and cube do not depend on fact_sales,
+-- so they must be dropped explicitly or a re-run fails on CREATE TABLE
+-- and keeps summary rows for facts that were just reset
+DROP TABLE IF EXISTS fact_sales_cube CASCADE;
+DROP TABLE IF EXISTS fact_sales_mlog CASCADE;
+DROP TABLE IF EXISTS mv_revenue_by_category CASCADE;
+DROP TABLE IF EXISTS mv_sales_by_region CASCADE;
+DROP TABLE IF EXISTS mv_top_products CASCADE;
+DROP TABLE IF EXISTS mv_quarterly_performance CASCADE;
+DROP TABLE IF EXISTS mv_refresh_log CASCADE;
 DROP TABLE IF EXISTS fact_sales CASCADE;
 DROP TABLE IF EXISTS dim_product CASCADE;
 DROP TABLE IF EXISTS dim_date CASCADE;
@@ -165,11 +175,261 @@ ORDER BY
 -- Create index on materialized view
 CREATE UNIQUE INDEX idx_mv_monthly_sales ON mv_monthly_sales (year, month);
 
--- Create a function to refresh materialized views
+-- Dashboard summaries powering the panels: the aggregation work is paid
+-- once per refresh instead of on every render.
+--
+-- The pure-SUM/COUNT summaries (category, region, top products,
+-- quarterly) are plain tables maintained incrementally from
+-- fact_sales_mlog, so each refresh costs O(changed rows). The two
+-- summaries with COUNT(DISTINCT customer_key) stay as materialized
+-- views with full refresh, since distinct counts cannot be updated
+-- from deltas alone.
+CREATE TABLE mv_revenue_by_category (
+    category VARCHAR(100) PRIMARY KEY,
+    revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+    order_count BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE mv_sales_by_region (
+    region_name VARCHAR(100) PRIMARY KEY,
+    revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+    orders BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE mv_top_products (
+    product_name VARCHAR(200) PRIMARY KEY,
+    revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+    units_sold BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE mv_quarterly_performance (
+    year INTEGER NOT NULL,
+    quarter INTEGER NOT NULL,
+    revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (year, quarter)
+);
+
+-- Change log (mlog) capturing fact_sales deltas for incremental refresh
+CREATE TABLE fact_sales_mlog (
+    mlog_id BIGSERIAL PRIMARY KEY,
+    dmltype CHAR(1) NOT NULL CHECK (dmltype IN ('I', 'D')),
+    product_key INTEGER NOT NULL,
+    date_key INTEGER NOT NULL,
+    region_key INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    total_amount DECIMAL(12,2) NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION log_fact_sales_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- An UPDATE is recorded as a delete of the old row plus an insert
+    -- of the new one, so the aggregates net out correctly
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO fact_sales_mlog (dmltype, product_key, date_key, region_key, quantity, total_amount)
+        VALUES ('D', OLD.product_key, OLD.date_key, OLD.region_key, OLD.quantity, OLD.total_amount);
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') THEN
+        INSERT INTO fact_sales_mlog (dmltype, product_key, date_key, region_key, quantity, total_amount)
+        VALUES ('I', NEW.product_key, NEW.date_key, NEW.region_key, NEW.quantity, NEW.total_amount);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER log_fact_sales_change
+AFTER INSERT OR UPDATE OR DELETE ON fact_sales
+FOR EACH ROW EXECUTE FUNCTION log_fact_sales_change();
+
+-- Drain the mlog and apply the signed deltas to the summary tables
+CREATE OR REPLACE FUNCTION apply_fact_sales_mlog()
+RETURNS VOID AS $$
+DECLARE
+    max_id BIGINT;
+BEGIN
+    SELECT MAX(mlog_id) INTO max_id FROM fact_sales_mlog;
+    IF max_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO mv_revenue_by_category (category, revenue, order_count)
+    SELECT p.category,
+           SUM(CASE WHEN m.dmltype = 'I' THEN m.total_amount ELSE -m.total_amount END),
+           SUM(CASE WHEN m.dmltype = 'I' THEN 1 ELSE -1 END)
+    FROM fact_sales_mlog m
+    JOIN dim_product p ON m.product_key = p.product_key
+    WHERE m.mlog_id <= max_id
+    GROUP BY p.category
+    ON CONFLICT (category) DO UPDATE
+    SET revenue = mv_revenue_by_category.revenue + EXCLUDED.revenue,
+        order_count = mv_revenue_by_category.order_count + EXCLUDED.order_count;
+
+    INSERT INTO mv_sales_by_region (region_name, revenue, orders)
+    SELECT r.region_name,
+           SUM(CASE WHEN m.dmltype = 'I' THEN m.total_amount ELSE -m.total_amount END),
+           SUM(CASE WHEN m.dmltype = 'I' THEN 1 ELSE -1 END)
+    FROM fact_sales_mlog m
+    JOIN dim_region r ON m.region_key = r.region_key
+    WHERE m.mlog_id <= max_id
+    GROUP BY r.region_name
+    ON CONFLICT (region_name) DO UPDATE
+    SET revenue = mv_sales_by_region.revenue + EXCLUDED.revenue,
+        orders = mv_sales_by_region.orders + EXCLUDED.orders;
+
+    INSERT INTO mv_top_products (product_name, revenue, units_sold)
+    SELECT p.product_name,
+           SUM(CASE WHEN m.dmltype = 'I' THEN m.total_amount ELSE -m.total_amount END),
+           SUM(CASE WHEN m.dmltype = 'I' THEN m.quantity ELSE -m.quantity END)
+    FROM fact_sales_mlog m
+    JOIN dim_product p ON m.product_key = p.product_key
+    WHERE m.mlog_id <= max_id
+    GROUP BY p.product_name
+    ON CONFLICT (product_name) DO UPDATE
+    SET revenue = mv_top_products.revenue + EXCLUDED.revenue,
+        units_sold = mv_top_products.units_sold + EXCLUDED.units_sold;
+
+    INSERT INTO mv_quarterly_performance (year, quarter, revenue)
+    SELECT d.year, d.quarter,
+           SUM(CASE WHEN m.dmltype = 'I' THEN m.total_amount ELSE -m.total_amount END)
+    FROM fact_sales_mlog m
+    JOIN dim_date d ON m.date_key = d.date_key
+    WHERE m.mlog_id <= max_id
+    GROUP BY d.year, d.quarter
+    ON CONFLICT (year, quarter) DO UPDATE
+    SET revenue = mv_quarterly_performance.revenue + EXCLUDED.revenue;
+
+    DELETE FROM fact_sales_mlog WHERE mlog_id <= max_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Pre-aggregated cube at day x product x region x segment grain. Every
+-- pure-SUM dashboard summary is a trivial rollup of this table, and
+-- rebuilding from the cube touches far fewer rows than re-scanning
+-- fact_sales (category and day collapse many order lines each).
+CREATE TABLE fact_sales_cube (
+    date_key INTEGER NOT NULL REFERENCES dim_date(date_key),
+    product_key INTEGER NOT NULL REFERENCES dim_product(product_key),
+    region_key INTEGER NOT NULL REFERENCES dim_region(region_key),
+    segment VARCHAR(50) NOT NULL,
+    revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+    quantity BIGINT NOT NULL DEFAULT 0,
+    order_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (date_key, product_key, region_key, segment)
+);
+
+CREATE OR REPLACE FUNCTION rebuild_fact_sales_cube()
+RETURNS VOID AS $$
+BEGIN
+    TRUNCATE fact_sales_cube;
+    INSERT INTO fact_sales_cube
+        (date_key, product_key, region_key, segment, revenue, quantity, order_count)
+    SELECT f.date_key, f.product_key, f.region_key, c.segment,
+           SUM(f.total_amount), SUM(f.quantity), COUNT(*)
+    FROM fact_sales f
+    JOIN dim_customer c ON f.customer_key = c.customer_key
+    GROUP BY f.date_key, f.product_key, f.region_key, c.segment;
+    ANALYZE fact_sales_cube;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Full rebuild of the pure-SUM summaries, derived from the cube rather
+-- than fact_sales. Day-to-day refreshes still go through the mlog;
+-- this is the recovery/backfill path (e.g. after bulk reloads when the
+-- trigger was disabled). The distinct-count views are not derivable
+-- from the cube and keep their own full REFRESH.
+CREATE OR REPLACE FUNCTION rebuild_summaries_from_cube()
+RETURNS VOID AS $$
+BEGIN
+    PERFORM rebuild_fact_sales_cube();
+
+    TRUNCATE mv_revenue_by_category;
+    INSERT INTO mv_revenue_by_category (category, revenue, order_count)
+    SELECT p.category, SUM(cb.revenue), SUM(cb.order_count)
+    FROM fact_sales_cube cb
+    JOIN dim_product p ON cb.product_key = p.product_key
+    GROUP BY p.category;
+
+    TRUNCATE mv_sales_by_region;
+    INSERT INTO mv_sales_by_region (region_name, revenue, orders)
+    SELECT r.region_name, SUM(cb.revenue), SUM(cb.order_count)
+    FROM fact_sales_cube cb
+    JOIN dim_region r ON cb.region_key = r.region_key
+    GROUP BY r.region_name;
+
+    TRUNCATE mv_top_products;
+    INSERT INTO mv_top_products (product_name, revenue, units_sold)
+    SELECT p.product_name, SUM(cb.revenue), SUM(cb.quantity)
+    FROM fact_sales_cube cb
+    JOIN dim_product p ON cb.product_key = p.product_key
+    GROUP BY p.product_name;
+
+    TRUNCATE mv_quarterly_performance;
+    INSERT INTO mv_quarterly_performance (year, quarter, revenue)
+    SELECT d.year, d.quarter, SUM(cb.revenue)
+    FROM fact_sales_cube cb
+    JOIN dim_date d ON cb.date_key = d.date_key
+    GROUP BY d.year, d.quarter;
+
+    -- The cube (and so the rebuilt totals) already reflects every row
+    -- currently in fact_sales, including changes whose deltas are
+    -- still queued in the mlog; purge it so the next incremental
+    -- refresh does not apply them a second time
+    DELETE FROM fact_sales_mlog;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE MATERIALIZED VIEW mv_customer_segments AS
+SELECT
+    c.segment,
+    COUNT(DISTINCT c.customer_key) AS customer_count,
+    SUM(f.total_amount) AS total_revenue
+FROM
+    fact_sales f
+    JOIN dim_customer c ON f.customer_key = c.customer_key
+GROUP BY
+    c.segment;
+
+CREATE UNIQUE INDEX idx_mv_customer_segments ON mv_customer_segments (segment);
+
+-- Track refresh times so dashboards can surface data staleness
+CREATE TABLE mv_refresh_log (
+    view_name VARCHAR(100) PRIMARY KEY,
+    last_refresh TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Refresh all dashboard summaries: the incremental tables drain the
+-- mlog at O(delta) cost, the distinct-count views do a full REFRESH
+-- (plain form: CONCURRENTLY cannot run inside a function's transaction)
 CREATE OR REPLACE FUNCTION refresh_materialized_views()
 RETURNS VOID AS $$
+DECLARE
+    view_name TEXT;
 BEGIN
-    REFRESH MATERIALIZED VIEW CONCURRENTLY mv_monthly_sales;
+    PERFORM apply_fact_sales_mlog();
+
+    FOREACH view_name IN ARRAY ARRAY[
+        'mv_monthly_sales',
+        'mv_customer_segments'
+    ] LOOP
+        EXECUTE format('REFRESH MATERIALIZED VIEW %I', view_name);
+    END LOOP;
+
+    FOREACH view_name IN ARRAY ARRAY[
+        'mv_monthly_sales',
+        'mv_revenue_by_category',
+        'mv_sales_by_region',
+        'mv_top_products',
+        'mv_customer_segments',
+        'mv_quarterly_performance'
+    ] LOOP
+        INSERT INTO mv_refresh_log (view_name, last_refresh)
+        VALUES (view_name, NOW())
+        ON CONFLICT (view_name) DO UPDATE SET last_refresh = NOW();
+    END LOOP;
+
+    -- Tell listeners (e.g. the dashboard's --watch mode) that fresh
+    -- data is available, so they only re-render on real refreshes
+    PERFORM pg_notify('mv_refreshed', 'refresh_materialized_views');
 END;
 $$ LANGUAGE plpgsql;
 